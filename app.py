@@ -1,11 +1,22 @@
-import requests
 import argparse
-from flask import Flask, request, render_template
+import atexit
+from flask import Flask, request, render_template, make_response, g, Response, stream_with_context
 import time
 import json
+import logging
 import os
+import csv
+import uuid
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from requests.exceptions import RequestException
 from dotenv import load_dotenv
+from caches import CityIndex, WeatherCache, cache_key
+from favorites_store import FavoritesStore
+from metrics import Registry
+from outfits import CATALOG, COLORS, GENDERS, MOODS, OCCASIONS
+from profiler import SamplingProfiler
+from weather_client import DEFAULT_BASE_URL, CityNotFoundError, WeatherClient
 
 app = Flask(__name__)
 
@@ -14,175 +25,313 @@ load_dotenv()
 API_KEY = os.getenv("WEATHER_API_KEY")
 DEFAULT_CITY = "London"
 FALLBACK_WEATHER = {"temp": 15, "condition": "partly cloudy"}
+CITY_NOT_FOUND = "City not found. Please select a valid city."
 FAVORITES_FILE = "favorites.json"
+FAVORITES_DB = os.getenv("FAVORITES_DB", "favorites.db")
+FAVORITES_PAGE_SIZE = int(os.getenv("FAVORITES_PAGE_SIZE", "50"))
+USER_COOKIE = "stylist_user"
+WEATHER_CACHE_FILE = "weather_cache.json"
+CACHE_TTL_CURRENT = int(os.getenv("WEATHER_CACHE_TTL_CURRENT", "600"))
+CACHE_TTL_FORECAST = int(os.getenv("WEATHER_CACHE_TTL_FORECAST", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "500"))
+CACHE_FLUSH_INTERVAL = float(os.getenv("WEATHER_CACHE_FLUSH_INTERVAL", "30"))
+FORECAST_DAYS = 4
+CITY_INDEX_FILE = "city_index.json"
+CITY_NEGATIVE_TTL = int(os.getenv("CITY_NEGATIVE_TTL", "86400"))
+CITY_VALID_MAX_AGE = int(os.getenv("CITY_VALID_MAX_AGE", "86400"))
+CITY_INDEX_MAX_KNOWN = int(os.getenv("CITY_INDEX_MAX_KNOWN", "10000"))
+CITY_INDEX_MAX_UNKNOWN = int(os.getenv("CITY_INDEX_MAX_UNKNOWN", "2000"))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "4096"))
+TEMP_LAYERS = {
+    None: "",
+    "freezing": ", heavy winter coat, scarf",
+    "cold": ", warm coat",
+    "cool": ", light jacket",
+    "mild": "",
+    "warm": "",
+    "hot": ", breathable hat",
+    "scorching": ", lightweight scarf",
+}
+SKY_EXTRAS = {"rain": ", and an umbrella", "snow": ", and snow boots"}
+PROFILE_DEFAULTS = {"occasion": "casual", "color": "default", "mood": "minimal", "city": DEFAULT_CITY, "gender": "male", "day": 0}
 
-def validate_city(city):
-    """Validate city using WeatherAPI's autocomplete endpoint."""
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("stylist")
+
+metrics = Registry()
+REQUEST_SECONDS = metrics.histogram("stylist_request_seconds", "Time spent handling HTTP requests.", ["endpoint"])
+STAGE_SECONDS = metrics.histogram("stylist_stage_seconds", "Time spent in each stage of the recommendation route.", ["stage"])
+UPSTREAM_SECONDS = metrics.histogram("stylist_upstream_seconds", "WeatherAPI call latency per attempt.", ["endpoint", "outcome"])
+ERRORS = metrics.counter("stylist_errors_total", "Errors by exception type.", ["type"])
+IN_FLIGHT = metrics.gauge("stylist_requests_in_flight", "HTTP requests currently being handled.")
+CACHE_EVENTS = metrics.counter("stylist_weather_cache_events_total", "Weather cache lookups and evictions.", ["event"])
+CACHE_ENTRIES = metrics.gauge("stylist_weather_cache_entries", "Cities currently held in the weather cache.")
+HIT_RATIO = metrics.gauge("stylist_cache_hit_ratio", "Hit ratio per cache.", ["cache"])
+CIRCUIT_OPEN = metrics.gauge("stylist_upstream_circuit_open", "1 while the WeatherAPI circuit breaker is open.")
+
+# Optional sampling profiler; collapsed stacks are served at /debug/profile
+profiler = None
+if os.getenv("STYLIST_PROFILE", "").lower() in ("1", "true", "yes"):
+    profiler = SamplingProfiler(interval=float(os.getenv("STYLIST_PROFILE_INTERVAL", "0.01"))).start()
+
+# Shared pooled client, sized so every batch worker can hold a connection
+weather_client = WeatherClient(
+    API_KEY,
+    base_url=os.getenv("WEATHER_API_BASE", DEFAULT_BASE_URL),
+    timeout=float(os.getenv("WEATHER_API_TIMEOUT", "5")),
+    max_concurrency=BATCH_WORKERS,
+    retries=int(os.getenv("WEATHER_API_RETRIES", "2")),
+    breaker_threshold=int(os.getenv("WEATHER_API_BREAKER_THRESHOLD", "5")),
+    breaker_reset=float(os.getenv("WEATHER_API_BREAKER_RESET", "30")),
+    on_call=lambda endpoint, seconds, outcome: UPSTREAM_SECONDS.observe(endpoint, outcome, value=seconds),
+)
+
+weather_cache = WeatherCache(WEATHER_CACHE_FILE, CACHE_MAX_ENTRIES, CACHE_FLUSH_INTERVAL)
+atexit.register(weather_cache.save)
+
+city_index = CityIndex(CITY_INDEX_FILE, CITY_NEGATIVE_TTL, CITY_INDEX_MAX_KNOWN, CITY_INDEX_MAX_UNKNOWN, CACHE_FLUSH_INTERVAL)
+atexit.register(city_index.save)
+favorites_store = FavoritesStore(FAVORITES_DB, legacy_path=FAVORITES_FILE)
+
+def validate_city(city, allow_network=True):
+    """Validate city against the local city index, falling back to WeatherAPI's autocomplete endpoint.
+
+    With allow_network=False an unseen city is optimistically accepted; the forecast call will reject it.
+    """
+    known = city_index.lookup(city)
+    if known is not None or not allow_network:
+        return (True, None) if known is not False else (False, CITY_NOT_FOUND)
     try:
-        response = requests.get(f"http://api.weatherapi.com/v1/search.json?key={API_KEY}&q={city}", timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        print(f"Autocomplete Response for {city}: {data}")
-        return (True, None) if data else (False, "City not found. Please select a valid city.")
+        data = weather_client.search(city)
+        logger.debug("Autocomplete response for %s: %s", city, data)
+        if not data:
+            city_index.add_unknown(city)
+            return False, CITY_NOT_FOUND
+        city_index.add_known(city, *(result.get("name") for result in data))
+        return True, None
     except RequestException as e:
-        print(f"City validation error: {str(e)}")
+        ERRORS.inc(type(e).__name__)
+        logger.warning("City validation error: %s", e)
         return False, f"Network error: {str(e)}. Check your connection."
 
-def get_weather(city, day=0):
-    """Get current or forecast weather for city using WeatherAPI."""
+def parse_forecast(data):
+    """Reduce a forecast.json payload to current conditions plus per-day summaries."""
+    return {
+        "current": {"temp": data["current"]["temp_c"], "condition": data["current"]["condition"]["text"].lower()},
+        "days": [
+            {"temp": d["day"]["avgtemp_c"], "min": d["day"]["mintemp_c"], "max": d["day"]["maxtemp_c"], "condition": d["day"]["condition"]["text"].lower()}
+            for d in data["forecast"]["forecastday"]
+        ],
+    }
+
+def fetch_forecast(city):
+    """Fetch the full forecast bundle for city from WeatherAPI, raising on failure."""
     try:
-        url = f"http://api.weatherapi.com/v1/forecast.json?key={API_KEY}&q={city}&days={day+1}&aqi=no"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        if day == 0:
-            weather = {"temp": data["current"]["temp_c"], "condition": data["current"]["condition"]["text"].lower()}
-        else:
-            weather = {"temp": data["forecast"]["forecastday"][day]["day"]["avgtemp_c"], "condition": data["forecast"]["forecastday"][day]["day"]["condition"]["text"].lower()}
-        print(f"Weather Response for {city}, day {day}: {weather}")
-        return weather, None
+        data = weather_client.forecast(city, FORECAST_DAYS)
+    except CityNotFoundError:
+        city_index.add_unknown(city)
+        raise
+    city_index.add_known(city, data.get("location", {}).get("name"))
+    return parse_forecast(data)
+
+def load_bundle(city, ttl):
+    """Return (bundle, error) for city from the weather cache, fetching it from WeatherAPI on a miss."""
+    try:
+        bundle, stale = weather_cache.get_or_fetch(cache_key(city), ttl, lambda: fetch_forecast(city))
+        if stale:
+            logger.info("Serving stale weather for %s", city)
+        return bundle, None
+    except CityNotFoundError:
+        return None, CITY_NOT_FOUND
     except RequestException as e:
-        print(f"Weather fetch error for {city}: {str(e)}")
-        return FALLBACK_WEATHER, f"Network error: {str(e)}."
+        ERRORS.inc(type(e).__name__)
+        logger.warning("Weather fetch error for %s: %s", city, e)
+        return None, f"Network error: {str(e)}."
     except Exception as e:
-        print(f"Unexpected error for {city}: {str(e)}")
-        return FALLBACK_WEATHER, f"API error: {str(e)}."
+        ERRORS.inc(type(e).__name__)
+        logger.warning("Unexpected error for %s: %s", city, e)
+        return None, f"API error: {str(e)}."
+
+def weather_for_day(bundle, day):
+    """Pick current conditions (day 0) or one forecast day out of a bundle."""
+    if day == 0:
+        return bundle["current"], None
+    if day < len(bundle["days"]):
+        return {"temp": bundle["days"][day]["temp"], "condition": bundle["days"][day]["condition"]}, None
+    return FALLBACK_WEATHER, f"Forecast for day {day} is unavailable."
+
+def get_weather(city, day=0):
+    """Get current or forecast weather for city from its cached forecast bundle."""
+    bundle, error = load_bundle(city, CACHE_TTL_CURRENT if day == 0 else CACHE_TTL_FORECAST)
+    if error:
+        return FALLBACK_WEATHER, error
+    weather, error = weather_for_day(bundle, day)
+    logger.debug("Weather for %s, day %s: %s", city, day, weather)
+    return weather, error
 
+def weather_bucket(temp, condition):
+    """Reduce weather to the (temperature band, sky) pair that outfit adjustments depend on."""
+    if temp is None:
+        band = None
+    elif temp < 5:
+        band = "freezing"
+    elif temp < 10:
+        band = "cold"
+    elif temp < 18:
+        band = "cool"
+    elif temp <= 20:
+        band = "mild"
+    elif temp <= 25:
+        band = "warm"
+    elif temp <= 30:
+        band = "hot"
+    else:
+        band = "scorching"
+    sky = None
+    if condition:
+        condition = condition.lower()
+        if any(w in condition for w in ("rain", "shower", "drizzle")):
+            sky = "rain"
+        elif "snow" in condition:
+            sky = "snow"
+        elif "clear" in condition:
+            sky = "clear"
+    return band, sky
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def outfit_for_bucket(occasion_key, gender, color, mood, band, sky):
+    """Return (items, description) for a normalized profile adjusted for a weather bucket."""
+    base_outfit, description = CATALOG[(occasion_key, gender, color, mood)]
+    base_outfit += TEMP_LAYERS[band]
+    if sky == "clear":
+        # Sunglasses only above 20°C
+        if band in ("warm", "hot", "scorching"):
+            base_outfit += ", and sunglasses"
+    elif sky:
+        base_outfit += SKY_EXTRAS[sky]
+    return base_outfit, description
+
+# typed: 15 and 15.0 render differently in the "Weather: …°C" text
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE, typed=True)
 def recommend_outfit(occasion, color, temp, condition, mood, city, gender, day):
     """Generate outfit recommendation with description based on inputs."""
-    valid_colors = ["blue", "red", "black", "white", "green", "yellow", "purple", "orange", "pink", "gray", "navy", "beige"]
     color = color.lower() if color else "default"
-    if color not in valid_colors:
+    if color not in COLORS:
         color = "default"
     gender = gender.lower() if gender else "male"
-    if gender not in ["male", "female"]:
+    if gender not in GENDERS:
         gender = "male"
-
-    outfits = {
-        "casual": {
-            "male": {
-                "blue": {
-                    "bold": {"items": "Blue leather jacket, black jeans, sneakers", "description": "This bold blue look screams confidence with a sleek leather jacket, perfect for a night out."},
-                    "minimal": {"items": "Blue chinos, white tee, loafers", "description": "A clean, minimalist blue outfit that’s effortlessly stylish for any casual day."},
-                    "cozy": {"items": "Blue hoodie, gray joggers, slip-ons", "description": "Stay comfy yet cool with this cozy blue hoodie ensemble, ideal for lounging or errands."}
-                },
-                "red": {"bold": {"items": "Red bomber jacket, black pants, boots", "description": "Make a statement with this vibrant red bomber jacket."}, "minimal": {"items": "Red shirt, khaki shorts, sneakers", "description": "Casual and cool red look."}, "cozy": {"items": "Red sweatshirt, black joggers, slippers", "description": "Warm and relaxed red outfit."}},
-                "black": {"bold": {"items": "Black denim jacket, gray tee, combat boots", "description": "Edgy black denim vibe."}, "minimal": {"items": "Black jeans, white shirt, sneakers", "description": "Simple black and white classic."}, "cozy": {"items": "Black hoodie, sweatpants, slippers", "description": "Ultimate black comfort."}},
-                "white": {"bold": {"items": "White graphic tee, cargo pants, high-tops", "description": "Bold white street style."}, "minimal": {"items": "White linen shirt, beige shorts, loafers", "description": "Crisp white summer look."}, "cozy": {"items": "White sweater, gray sweats, sneakers", "description": "Cozy white warmth."}},
-                "green": {"bold": {"items": "Green parka, black jeans, boots", "description": "Rugged green adventure style."}, "minimal": {"items": "Green polo, khaki pants, sneakers", "description": "Fresh green casual."}, "cozy": {"items": "Green hoodie, joggers, slip-ons", "description": "Relaxed green comfort."}},
-                "yellow": {"bold": {"items": "Yellow jacket, black shorts, sneakers", "description": "Bright yellow energy."}, "minimal": {"items": "Yellow tee, denim jeans, loafers", "description": "Sunny yellow simplicity."}, "cozy": {"items": "Yellow sweatshirt, gray pants, sneakers", "description": "Warm yellow coziness."}},
-                "purple": {"bold": {"items": "Purple blazer, black tee, jeans", "description": "Vibrant purple flair."}, "minimal": {"items": "Purple shirt, gray shorts, sneakers", "description": "Subtle purple charm."}, "cozy": {"items": "Purple hoodie, black joggers, slippers", "description": "Cozy purple retreat."}},
-                "orange": {"bold": {"items": "Orange windbreaker, black pants, boots", "description": "Bold orange adventure."}, "minimal": {"items": "Orange tee, khaki shorts, sneakers", "description": "Playful orange casual."}, "cozy": {"items": "Orange sweater, joggers, slip-ons", "description": "Warm orange comfort."}},
-                "pink": {"bold": {"items": "Pink jacket, white tee, jeans", "description": "Striking pink confidence."}, "minimal": {"items": "Pink shirt, beige pants, loafers", "description": "Soft pink elegance."}, "cozy": {"items": "Pink hoodie, gray sweats, sneakers", "description": "Cozy pink vibes."}},
-                "gray": {"bold": {"items": "Gray graphic tee, black cargo pants, sneakers", "description": "Urban gray edge."}, "minimal": {"items": "Gray polo, denim jeans, oxfords", "description": "Classic gray polish."}, "cozy": {"items": "Gray sweatshirt, joggers, slippers", "description": "Relaxed gray comfort."}},
-                "navy": {"bold": {"items": "Navy bomber jacket, black jeans, boots", "description": "Sleek navy cool."}, "minimal": {"items": "Navy shirt, khaki chinos, sneakers", "description": "Crisp navy casual."}, "cozy": {"items": "Navy hoodie, gray joggers, slip-ons", "description": "Cozy navy warmth."}},
-                "beige": {"bold": {"items": "Beige jacket, black pants, sneakers", "description": "Modern beige flair."}, "minimal": {"items": "Beige tee, denim shorts, loafers", "description": "Light beige ease."}, "cozy": {"items": "Beige sweater, joggers, sneakers", "description": "Warm beige comfort."}},
-                "default": {"bold": {"items": "Gray tee, cargo pants, high-tops", "description": "Versatile gray street style."}, "minimal": {"items": "Gray polo, jeans, oxfords", "description": "Timeless gray simplicity."}, "cozy": {"items": "Gray sweatshirt, joggers, sneakers", "description": "Ultimate gray coziness."}}
-            },
-            "female": {
-                "blue": {
-                    "bold": {"items": "Blue denim skirt, crop top, ankle boots", "description": "This bold blue outfit radiates trendy vibes with a chic denim skirt, perfect for a stylish day out."},
-                    "minimal": {"items": "Blue midi dress, white sneakers", "description": "A sleek blue midi dress for a minimalist, effortless look that shines anywhere."},
-                    "cozy": {"items": "Blue knit sweater, leggings, fuzzy boots", "description": "Wrap yourself in cozy blue comfort with this soft sweater and fuzzy boots combo."}
-                },
-                "red": {"bold": {"items": "Red jumpsuit, black heels", "description": "Fiery red jumpsuit for a bold statement."}, "minimum": {"items": "Red blouse, white jeans, flats", "description": "Elegant red and white simplicity."}, "cozy": {"items": "Red cardigan, black leggings, slippers", "description": "Cozy red warmth."}},
-                "black": {"bold": {"items": "Black leather pants, graphic tee, boots", "description": "Edgy black leather look."}, "minimal": {"items": "Black shift dress, ballet flats", "description": "Classic black dress elegance."}, "cozy": {"items": "Black oversized sweater, joggers, sneakers", "description": "Relaxed black comfort."}},
-                "white": {"bold": {"items": "White blazer, ripped jeans, heels", "description": "Chic white blazer style."}, "minimal": {"items": "White sundress, sandals", "description": "Breezy white summer dress."}, "cozy": {"items": "White hoodie, sweatpants, fuzzy socks", "description": "Cozy white lounge wear."}},
-                "green": {"bold": {"items": "Green maxi skirt, crop top, sandals", "description": "Vibrant green boho chic."}, "minimal": {"items": "Green blouse, beige pants, flats", "description": "Fresh green elegance."}, "cozy": {"items": "Green sweater, leggings, boots", "description": "Warm green coziness."}},
-                "yellow": {"bold": {"items": "Yellow dress, statement necklace, heels", "description": "Sunny yellow glamour."}, "minimal": {"items": "Yellow top, denim skirt, sneakers", "description": "Playful yellow casual."}, "cozy": {"items": "Yellow hoodie, joggers, slippers", "description": "Cozy yellow comfort."}},
-                "purple": {"bold": {"items": "Purple jumpsuit, gold earrings, boots", "description": "Regal purple flair."}, "minimal": {"items": "Purple blouse, black jeans, flats", "description": "Subtle purple charm."}, "cozy": {"items": "Purple cardigan, leggings, sneakers", "description": "Cozy purple retreat."}},
-                "orange": {"bold": {"items": "Orange skirt, white top, heels", "description": "Bold orange vibrancy."}, "minimal": {"items": "Orange dress, sandals", "description": "Bright orange simplicity."}, "cozy": {"items": "Orange sweater, black joggers, boots", "description": "Warm orange comfort."}},
-                "pink": {"bold": {"items": "Pink blazer, black dress, heels", "description": "Striking pink sophistication."}, "minimal": {"items": "Pink top, white shorts, flats", "description": "Soft pink casual."}, "cozy": {"items": "Pink hoodie, gray leggings, slippers", "description": "Cozy pink vibes."}},
-                "gray": {"bold": {"items": "Gray jumpsuit, statement belt, boots", "description": "Modern gray edge."}, "minimal": {"items": "Gray blouse, black skirt, flats", "description": "Classic gray polish."}, "cozy": {"items": "Gray sweatshirt, leggings, sneakers", "description": "Relaxed gray comfort."}},
-                "navy": {"bold": {"items": "Navy dress, silver accessories, heels", "description": "Elegant navy glamour."}, "minimal": {"items": "Navy top, beige pants, sneakers", "description": "Crisp navy casual."}, "cozy": {"items": "Navy cardigan, black leggings, boots", "description": "Cozy navy warmth."}},
-                "beige": {"bold": {"items": "Beige trench coat, black dress, boots", "description": "Sophisticated beige style."}, "minimal": {"items": "Beige blouse, denim jeans, flats", "description": "Light beige ease."}, "cozy": {"items": "Beige hoodie, joggers, sneakers", "description": "Warm beige comfort."}},
-                "default": {"bold": {"items": "Gray jumpsuit, necklace, boots", "description": "Versatile gray chic."}, "minimal": {"items": "Gray blouse, black jeans, flats", "description": "Timeless gray simplicity."}, "cozy": {"items": "Gray sweatshirt, leggings, sneakers", "description": "Ultimate gray coziness."}}
-            }
-        },
-        "formal": {
-            "male": {
-                "blue": {"bold": {"items": "Navy suit, patterned blue tie, brogues", "description": "Sharp navy suit for a bold formal presence."}, "minimal": {"items": "Navy suit, white shirt, no tie", "description": "Clean navy suit elegance."}, "cozy": {"items": "Navy blazer, white shirt, wool scarf", "description": "Warm navy formal style."}},
-                "default": {"bold": {"items": "Gray suit, colorful tie, wingtips", "description": "Classic gray suit flair."}, "minimal": {"items": "Gray suit, white shirt, black shoes", "description": "Timeless gray suit."}, "cozy": {"items": "Gray suit, turtleneck, overcoat", "description": "Cozy gray formal."}}
-            },
-            "female": {
-                "blue": {"bold": {"items": "Navy gown, statement earrings, heels", "description": "Elegant navy gown for a stunning entrance."}, "minimal": {"items": "Navy pencil dress, nude pumps", "description": "Sleek navy dress sophistication."}, "cozy": {"items": "Navy wrap dress, warm shawl", "description": "Cozy navy elegance."}},
-                "default": {"bold": {"items": "Gray gown, pearl necklace, heels", "description": "Regal gray gown."}, "minimal": {"items": "Gray dress, black pumps", "description": "Simple gray elegance."}, "cozy": {"items": "Gray blazer, turtleneck, trousers", "description": "Warm gray formal."}}
-            }
-        },
-        "work": {
-            "male": {
-                "blue": {"bold": {"items": "Blue blazer, white shirt, khaki pants, loafers", "description": "Professional blue blazer for a confident office look."}, "minimal": {"items": "Blue dress shirt, gray slacks, oxfords", "description": "Crisp blue shirt for a polished workday."}, "cozy": {"items": "Blue sweater, chinos, boots", "description": "Comfortable blue sweater for a relaxed office vibe."}},
-                "default": {"bold": {"items": "Gray blazer, white shirt, navy pants, loafers", "description": "Sharp gray office style."}, "minimal": {"items": "Gray shirt, black slacks, oxfords", "description": "Simple gray work look."}, "cozy": {"items": "Gray sweater, chinos, boots", "description": "Cozy gray office comfort."}}
-            },
-            "female": {
-                "blue": {"bold": {"items": "Blue pantsuit, white blouse, heels", "description": "Powerful blue pantsuit for a commanding office presence."}, "minimal": {"items": "Blue blouse, pencil skirt, flats", "description": "Elegant blue blouse for a professional day."}, "cozy": {"items": "Blue cardigan, trousers, boots", "description": "Cozy blue cardigan for a comfortable workday."}},
-                "default": {"bold": {"items": "Gray blazer, white dress, heels", "description": "Chic gray office style."}, "minimal": {"items": "Gray blouse, black skirt, flats", "description": "Simple gray work look."}, "cozy": {"items": "Gray cardigan, trousers, boots", "description": "Cozy gray office comfort."}}
-            }
-        },
-        "party": {
-            "male": {
-                "blue": {"bold": {"items": "Blue velvet blazer, black shirt, jeans, loafers", "description": "Sleek blue velvet for a standout party vibe."}, "minimal": {"items": "Blue shirt, black pants, sneakers", "description": "Cool blue party casual."}, "cozy": {"items": "Blue sweater, chinos, boots", "description": "Relaxed blue party comfort."}},
-                "default": {"bold": {"items": "Gray blazer, black shirt, jeans, loafers", "description": "Stylish gray party look."}, "minimal": {"items": "Gray tee, black pants, sneakers", "description": "Simple gray party style."}, "cozy": {"items": "Gray hoodie, jeans, boots", "description": "Cozy gray party vibe."}}
-            },
-            "female": {
-                "blue": {"bold": {"items": "Blue sequin dress, heels", "description": "Dazzling blue sequins to light up the party."}, "minimal": {"items": "Blue top, black jeans, flats", "description": "Chic blue party casual."}, "cozy": {"items": "Blue sweater, skirt, boots", "description": "Cozy blue party comfort."}},
-                "default": {"bold": {"items": "Gray party dress, heels", "description": "Sparkling gray party glamour."}, "minimal": {"items": "Gray top, black jeans, flats", "description": "Simple gray party look."}, "cozy": {"items": "Gray cardigan, jeans, boots", "description": "Cozy gray party style."}}
-            }
-        },
-        "date_night": {
-            "male": {
-                "blue": {"bold": {"items": "Blue blazer, black shirt, jeans, loafers", "description": "Suave blue blazer for a romantic evening."}, "minimal": {"items": "Blue shirt, gray pants, sneakers", "description": "Effortless blue date-night charm."}, "cozy": {"items": "Blue sweater, chinos, boots", "description": "Warm blue outfit for a cozy date."}},
-                "default": {"bold": {"items": "Gray blazer, black shirt, jeans, loafers", "description": "Sleek gray date-night style."}, "minimal": {"items": "Gray shirt, navy pants, sneakers", "description": "Simple gray date look."}, "cozy": {"items": "Gray sweater, jeans, boots", "description": "Cozy gray date comfort."}}
-            },
-            "female": {
-                "blue": {"bold": {"items": "Blue wrap dress, heels", "description": "Elegant blue wrap dress for a stunning date night."}, "minimal": {"items": "Blue blouse, black jeans, flats", "description": "Chic blue date-night casual."}, "cozy": {"items": "Blue sweater, skirt, boots", "description": "Cozy blue outfit for a romantic evening."}},
-                "default": {"bold": {"items": "Gray dress, black heels", "description": "Romantic gray date-night glamour."}, "minimal": {"items": "Gray blouse, black jeans, flats", "description": "Simple gray date look."}, "cozy": {"items": "Gray cardigan, jeans, boots", "description": "Cozy gray date comfort."}}
-            }
-        }
-    }
     mood = mood.lower() if mood else "minimal"
-    if mood not in ["bold", "minimal", "cozy"]:
+    if mood not in MOODS:
         mood = "minimal"
-    
-    outfit_data = outfits.get(occasion.lower(), outfits["casual"]).get(gender).get(color, outfits[occasion.lower()][gender]["default"]).get(mood)
-    base_outfit = outfit_data["items"]
-    description = outfit_data["description"]
-    
-    # Weather-based adjustments
+    occasion_key = occasion.lower()
+    if occasion_key not in OCCASIONS:
+        occasion_key = "casual"
+
+    base_outfit, description = outfit_for_bucket(occasion_key, gender, color, mood, *weather_bucket(temp, condition))
     day_text = "Today" if day == 0 else f"In {day} day{'s' if day > 1 else ''}"
-    if temp is not None:
-        if temp < 5:
-            base_outfit += ", heavy winter coat, scarf"
-        elif temp < 10:
-            base_outfit += ", warm coat"
-        elif temp < 18:
-            base_outfit += ", light jacket"
-        elif temp > 30:
-            base_outfit += ", lightweight scarf"
-        elif temp > 25:
-            base_outfit += ", breathable hat"
-    
-    if condition:
-        if any(w in condition.lower() for w in ["rain", "shower", "drizzle"]):
-            base_outfit += ", and an umbrella"
-        elif "snow" in condition.lower():
-            base_outfit += ", and snow boots"
-        elif "clear" in condition.lower() and temp > 20:
-            base_outfit += ", and sunglasses"
-    
     return f"Recommended outfit for {occasion} in {color} (Mood: {mood}, Gender: {gender}, Weather: {temp}°C, {condition}, City: {city}, {day_text}): {base_outfit}\n\n{description}"
 
+def normalize_row(row):
+    """Fill a batch row's missing profile fields with defaults."""
+    if isinstance(row, ValueError):
+        raise row
+    profile = {field: row.get(field) or default for field, default in PROFILE_DEFAULTS.items()}
+    for field, value in profile.items():
+        allowed = (str, int) if field == "day" else str
+        if not isinstance(value, allowed):
+            raise TypeError(f"{field} must be a {'string or integer' if field == 'day' else 'string'}")
+    profile["city"] = str(profile["city"]).strip() or DEFAULT_CITY
+    profile["day"] = int(profile["day"])
+    if not 0 <= profile["day"] < FORECAST_DAYS:
+        raise ValueError(f"day must be between 0 and {FORECAST_DAYS - 1}")
+    return profile
+
+def recommend_city_rows(city, indexed_rows):
+    """Build recommendations for every (index, profile) row sharing one city.
+
+    The city is checked against the index and its bundle fetched once for the
+    whole group; a rejected city or failed fetch becomes every row's error.
+    """
+    is_valid, error = validate_city(city, allow_network=False)
+    bundle = None
+    if not is_valid:
+        error = f"Invalid city: {error}"
+    else:
+        # Fetch with the strictest TTL any row needs so day 0 rows never see old current conditions
+        ttl = CACHE_TTL_CURRENT if any(profile["day"] == 0 for _, profile in indexed_rows) else CACHE_TTL_FORECAST
+        bundle, error = load_bundle(city, ttl)
+    results = []
+    for index, profile in indexed_rows:
+        recommendation, row_error = None, error
+        if bundle is not None:
+            try:
+                weather, row_error = weather_for_day(bundle, profile["day"])
+                if not row_error:
+                    recommendation = recommend_outfit(profile["occasion"], profile["color"], weather["temp"], weather["condition"], profile["mood"], city, profile["gender"], profile["day"])
+            except Exception as e:
+                # One bad row must not cut off the rest of the city group or the stream
+                ERRORS.inc(type(e).__name__)
+                logger.warning("Batch row %s failed: %s", index, e)
+                row_error = f"Recommendation error: {str(e)}."
+        results.append({"row": index, **profile, "recommendation": recommendation, "error": row_error})
+    return results
+
+def recommend_batch(rows, workers=BATCH_WORKERS):
+    """Yield one result per row as soon as its city's weather is available.
+
+    Rows are grouped by normalized city so each unique city is fetched once,
+    with up to `workers` cities in flight at a time. Results arrive in
+    completion order; each carries its input "row" index.
+    """
+    by_city = {}
+    for index, row in enumerate(rows):
+        try:
+            profile = normalize_row(row)
+        except (TypeError, ValueError, AttributeError) as e:
+            yield {"row": index, "recommendation": None, "error": f"Invalid row: {str(e)}."}
+            continue
+        by_city.setdefault(cache_key(profile["city"]), []).append((index, profile))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(recommend_city_rows, indexed_rows[0][1]["city"], indexed_rows) for indexed_rows in by_city.values()]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def read_batch_file(path):
+    """Read batch rows from a CSV file (by extension) or a JSON Lines file."""
+    with open(path, "r", newline="") as f:
+        if path.lower().endswith(".csv"):
+            return list(csv.DictReader(f))
+        rows = []
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                # Kept in place so the bad line comes back as an "Invalid row" result
+                rows.append(ValueError(f"line {number} is not valid JSON ({e})"))
+        return rows
+
 def run_cli():
     """Run CLI mode with argparse."""
     parser = argparse.ArgumentParser(description="AI Stylist: Get outfit recommendations")
-    parser.add_argument("--occasion", type=str, default="casual", choices=["casual", "formal", "work", "party", "date_night"], help="Occasion")
-    parser.add_argument("--color", type=str, default="default", choices=["blue", "red", "black", "white", "green", "yellow", "purple", "orange", "pink", "gray", "navy", "beige", "default"], help="Color preference")
-    parser.add_argument("--mood", type=str, default="minimal", choices=["bold", "minimal", "cozy"], help="Style mood")
+    parser.add_argument("--occasion", type=str, default="casual", choices=OCCASIONS, help="Occasion")
+    parser.add_argument("--color", type=str, default="default", choices=COLORS + ("default",), help="Color preference")
+    parser.add_argument("--mood", type=str, default="minimal", choices=MOODS, help="Style mood")
     parser.add_argument("--city", type=str, default=DEFAULT_CITY, help="City for weather-based recommendation")
-    parser.add_argument("--gender", type=str, default="male", choices=["male", "female"], help="Gender")
-    parser.add_argument("--day", type=int, default=0, choices=[0, 1, 2, 3], help="Weather forecast day (0=today, 1-3=forecast)")
+    parser.add_argument("--gender", type=str, default="male", choices=GENDERS, help="Gender")
+    parser.add_argument("--day", type=int, default=0, choices=range(FORECAST_DAYS), help="Weather forecast day (0=today, 1-3=forecast)")
+    parser.add_argument("--batch", type=str, help="CSV or JSONL file of city/day/occasion/color/mood/gender rows; prints one JSON result per line")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Concurrent city fetches in batch mode")
     args = parser.parse_args()
 
+    if args.batch:
+        for result in recommend_batch(read_batch_file(args.batch), args.workers):
+            print(json.dumps(result), flush=True)
+        return
+
     is_valid, error = validate_city(args.city)
     if not is_valid:
         print(f"Error: Invalid city - {error}. Using {DEFAULT_CITY}")
@@ -194,6 +343,35 @@ def run_cli():
     recommendation = recommend_outfit(args.occasion, args.color, weather["temp"], weather["condition"], args.mood, args.city, args.gender, args.day)
     print(recommendation)
 
+@app.before_request
+def start_request_timer():
+    IN_FLIGHT.inc()
+    g.request_start = time.perf_counter()
+
+@app.teardown_request
+def record_request(exc):
+    if exc is not None:
+        ERRORS.inc(type(exc).__name__)
+    start = g.pop("request_start", None)
+    if start is None:
+        return  # Context pushed without dispatching a request
+    IN_FLIGHT.dec()
+    REQUEST_SECONDS.observe(request.endpoint or "unknown", value=time.perf_counter() - start)
+
+@metrics.collector
+def collect_cache_metrics():
+    """Refresh cache and circuit gauges from their owners at scrape time."""
+    stats = weather_cache.snapshot_stats()
+    for event in ("hits", "misses", "stale", "evictions"):
+        CACHE_EVENTS.set(event, value=stats[event])
+    CACHE_ENTRIES.set(value=stats["size"])
+    HIT_RATIO.set("weather", value=stats["hit_ratio"])
+    for name, cached in (("recommendations", recommend_outfit), ("outfit_buckets", outfit_for_bucket)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        HIT_RATIO.set(name, value=round(info.hits / lookups, 4) if lookups else 0.0)
+    CIRCUIT_OPEN.set(value=int(weather_client.breaker.state == "open"))
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     """Handle web app requests."""
@@ -210,49 +388,103 @@ def index():
         if not city:
             error = "City name cannot be empty."
         else:
-            is_valid, city_error = validate_city(city)
+            with STAGE_SECONDS.time("validate_city"):
+                is_valid, city_error = validate_city(city, allow_network=False)
+            if is_valid:
+                with STAGE_SECONDS.time("weather_fetch"):
+                    weather, weather_error = get_weather(city, day)
+                # An unseen city is only rejected once the forecast call reports it
+                if weather_error == CITY_NOT_FOUND:
+                    is_valid, city_error = False, weather_error
             if not is_valid:
                 error = f"Invalid city: {city_error}. Using {DEFAULT_CITY}."
                 city = DEFAULT_CITY
-            if not error:
-                weather, weather_error = get_weather(city, day)
-                if weather_error:
-                    error = weather_error
-                else:
+            elif weather_error:
+                error = weather_error
+            else:
+                with STAGE_SECONDS.time("recommendation"):
                     recommendation = recommend_outfit(occasion, color, weather["temp"], weather["condition"], mood, city, gender, day)
         defaults.update({"occasion": occasion, "color": color, "mood": mood, "city": city, "gender": gender, "day": str(day)})
-    return render_template("index.html", recommendation=recommendation, error=error, defaults=defaults, timestamp=int(time.time()))
+    with STAGE_SECONDS.time("render"):
+        return render_template("index.html", recommendation=recommendation, error=error, defaults=defaults, timestamp=int(time.time()))
+
+@app.route("/batch_recommend", methods=["POST"])
+def batch_recommend():
+    """Stream recommendations for a JSON list of profile rows as JSON Lines."""
+    payload = request.get_json(silent=True)
+    rows = payload.get("rows") if isinstance(payload, dict) else payload
+    if not isinstance(rows, list):
+        return {"error": "Expected a JSON list of rows or {\"rows\": [...]}."}, 400
+    results = (json.dumps(result) + "\n" for result in recommend_batch(rows))
+    return Response(stream_with_context(results), mimetype="application/x-ndjson")
 
 @app.route("/save_favorite", methods=["POST"])
 def save_favorite():
-    """Save an outfit to favorites."""
+    """Save an outfit to the current user's favorites."""
     outfit = request.form.get("outfit")
-    if not os.path.exists(FAVORITES_FILE):
-        with open(FAVORITES_FILE, "w") as f:
-            json.dump([], f)
-    with open(FAVORITES_FILE, "r+") as f:
-        favorites = json.load(f)
-        favorites.append(outfit)
-        f.seek(0)
-        json.dump(favorites, f, indent=2)
-    return {"status": "success"}
+    if not outfit:
+        return {"status": "error", "error": "No outfit to save."}, 400
+    user = request.cookies.get(USER_COOKIE)
+    if not user:
+        user = uuid.uuid4().hex
+        # The first browser to get a cookie inherits the favorites imported from favorites.json
+        favorites_store.claim_legacy(user)
+    saved = favorites_store.add(outfit, user)
+    response = make_response({"status": "success", "duplicate": not saved})
+    if USER_COOKIE not in request.cookies:
+        response.set_cookie(USER_COOKIE, user, max_age=365 * 24 * 3600, samesite="Lax")
+    return response
 
 @app.route("/favorites")
 def view_favorites():
-    """View saved favorite outfits."""
-    try:
-        with open(FAVORITES_FILE, "r") as f:
-            favorites = json.load(f)
-    except FileNotFoundError:
-        favorites = []
-    return render_template("favorites.html", favorites=favorites)
+    """View one page of the current user's saved favorite outfits."""
+    favorites, prev_cursor, next_cursor = favorites_store.list(
+        request.cookies.get(USER_COOKIE),
+        after=request.args.get("after", type=int),
+        before=request.args.get("before", type=int),
+        per_page=FAVORITES_PAGE_SIZE,
+    )
+    return render_template("favorites.html", favorites=favorites, prev_cursor=prev_cursor, next_cursor=next_cursor)
 
 @app.route("/validate_city", methods=["GET"])
 def validate_city_endpoint():
     """Validate city via API for client-side requests."""
-    city = request.args.get("city")
+    city = request.args.get("city") or ""
     is_valid, error = validate_city(city)
-    return {"valid": is_valid, "error": error}
+    response = make_response({"valid": is_valid, "error": error})
+    # Known cities rarely change; network errors are never cached
+    if is_valid:
+        response.cache_control.public = True
+        response.cache_control.max_age = CITY_VALID_MAX_AGE
+    elif error == CITY_NOT_FOUND:
+        # Never cache a rejection longer than the server itself remembers it
+        response.cache_control.public = True
+        response.cache_control.max_age = CITY_NEGATIVE_TTL
+    else:
+        response.cache_control.no_store = True
+    return response
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    """Expose weather cache counters for TTL tuning, plus upstream client stats."""
+    return {
+        **weather_cache.snapshot_stats(),
+        "upstream": weather_client.stats(),
+        "recommendations": recommend_outfit.cache_info()._asdict(),
+        "outfit_buckets": outfit_for_bucket.cache_info()._asdict(),
+    }
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Expose request, upstream and cache metrics in Prometheus text format."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/debug/profile", methods=["GET"])
+def profile_endpoint():
+    """Return sampled stacks in collapsed format when STYLIST_PROFILE is enabled."""
+    if profiler is None:
+        return {"error": "Profiling is disabled. Set STYLIST_PROFILE=1 to enable it."}, 404
+    return Response(profiler.collapsed(request.args.get("limit", type=int)), mimetype="text/plain")
 
 if __name__ == "__main__":
     import sys
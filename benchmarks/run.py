@@ -0,0 +1,154 @@
+"""Offline benchmark suite: recommend_outfit microbenchmarks and end-to-end route latency against a stub WeatherAPI.
+
+Usage: python -m benchmarks.run [--requests N] [--concurrency C] [--latency S] [--error-rate R] [--output FILE]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_server import StubWeatherAPI
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CITIES = ["London", "Paris", "Tokyo", "Mumbai", "New York", "Sydney", "Cairo", "Lima", "Oslo", "Toronto"]
+
+def summarize(latencies, elapsed):
+    """Throughput and latency percentiles (milliseconds) for a list of per-call seconds."""
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "count": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+def bench_recommend_outfit(app_module, repeat):
+    """Time recommend_outfit over every occasion/gender/color/mood combination, uncached and memoized."""
+    combos = list(itertools.product(
+        app_module.OCCASIONS, app_module.GENDERS, app_module.COLORS + ("default",), app_module.MOODS,
+    ))
+    weathers = [(-2, "moderate snow"), (12, "light rain"), (22, "clear"), (31, "sunny")]
+    raw = getattr(app_module.recommend_outfit, "__wrapped__", app_module.recommend_outfit)
+    results = {"combinations": len(combos) * len(weathers)}
+    clear_bucket_memo = getattr(getattr(app_module, "outfit_for_bucket", None), "cache_clear", None)
+    for name, func in (("uncached", raw), ("memoized", app_module.recommend_outfit)):
+        elapsed = 0.0
+        for _ in range(repeat):
+            # Each (profile, bucket) occurs once per pass, so clearing per pass keeps every uncached call cold
+            if name == "uncached" and clear_bucket_memo:
+                clear_bucket_memo()
+            start = time.perf_counter()
+            for occasion, gender, color, mood in combos:
+                for temp, condition in weathers:
+                    func(occasion, color, temp, condition, mood, "London", gender, 1)
+            elapsed += time.perf_counter() - start
+        calls = repeat * len(combos) * len(weathers)
+        results[name] = {"calls": calls, "us_per_call": round(elapsed / calls * 1e6, 3)}
+    return results
+
+def run_route(client_factory, make_request, total, concurrency):
+    """Issue `total` requests across `concurrency` threads; returns summary stats and error count."""
+    def worker(indices):
+        client = client_factory()
+        timings, errors = [], 0
+        for i in indices:
+            start = time.perf_counter()
+            response = make_request(client, i)
+            timings.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+        return timings, errors
+
+    chunks = [range(w, total, concurrency) for w in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(worker, chunks))
+    elapsed = time.perf_counter() - start
+    latencies = [t for timings, _ in outcomes for t in timings]
+    summary = summarize(latencies, elapsed)
+    summary["http_errors"] = sum(errors for _, errors in outcomes)
+    return summary
+
+def bench_routes(app_module, total, concurrency):
+    """End-to-end latency for the web routes using Flask's test client."""
+    flask_app = app_module.app
+    form = lambda i: {
+        "city": CITIES[i % len(CITIES)], "day": str(i % 4), "occasion": "casual",
+        "color": "blue", "mood": "bold", "gender": "male" if i % 2 else "female",
+    }
+    routes = {
+        "POST /": lambda c, i: c.post("/", data=form(i)),
+        "GET /validate_city": lambda c, i: c.get("/validate_city", query_string={"city": CITIES[i % len(CITIES)]}),
+        "POST /save_favorite": lambda c, i: c.post("/save_favorite", data={"outfit": f"Benchmark outfit {i}"}),
+        "GET /favorites": lambda c, i: c.get("/favorites"),
+    }
+    return {name: run_route(flask_app.test_client, make_request, total, concurrency) for name, make_request in routes.items()}
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Stylist benchmark suite (runs fully offline)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=4, help="Client threads per route")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over all combinations in the microbenchmark")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub WeatherAPI latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub responses that are 503s")
+    parser.add_argument("--output", type=str, help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    stub = StubWeatherAPI(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate).start()
+    workdir = tempfile.mkdtemp(prefix="stylist-bench-")
+    # The app reads its configuration and data files at import time, so point both at the sandbox first
+    os.environ["WEATHER_API_BASE"] = stub.url
+    os.environ.setdefault("WEATHER_API_KEY", "bench")
+    # Injected stub errors would otherwise log a warning per failed request
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+    try:
+        import app as app_module
+
+        results = {
+            "timestamp": time.time(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "config": vars(args),
+            "recommend_outfit": bench_recommend_outfit(app_module, args.repeat),
+            "routes": bench_routes(app_module, args.requests, args.concurrency),
+            "stub_requests": stub.requests,
+        }
+        cache_stats = getattr(app_module, "cache_stats", None)
+        if cache_stats:
+            with app_module.app.test_request_context():
+                results["cache"] = cache_stats()
+    finally:
+        stub.stop()
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2, default=str)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Local stand-in for WeatherAPI's search.json and forecast.json with configurable latency and errors."""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = ["Sunny", "Clear", "Partly cloudy", "Light rain", "Patchy rain nearby", "Moderate snow", "Overcast"]
+
+def city_weather(city, days):
+    """Deterministic fake forecast payload for city."""
+    seed = int(hashlib.md5(city.lower().encode()).hexdigest(), 16)
+    base = seed % 35 - 5
+    forecast = []
+    for day in range(days):
+        avg = base + day
+        forecast.append({"day": {
+            "avgtemp_c": avg, "mintemp_c": avg - 4, "maxtemp_c": avg + 4,
+            "condition": {"text": CONDITIONS[(seed + day) % len(CONDITIONS)]},
+        }})
+    return {
+        "location": {"name": city.title()},
+        "current": {"temp_c": base, "condition": {"text": CONDITIONS[seed % len(CONDITIONS)]}},
+        "forecast": {"forecastday": forecast},
+    }
+
+class StubWeatherAPI:
+    """Threaded HTTP server answering like WeatherAPI's /v1 endpoints.
+
+    Every request sleeps `latency` seconds (plus up to `jitter`), and a fraction
+    `error_rate` of requests get a 503, as do the next `fail_next` requests.
+    Cities starting with "Nowhere" are unknown.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_next = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                status, body = stub.respond(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def respond(self, path):
+        """Return (status, body) for a request path."""
+        with self.lock:
+            self.requests += 1
+            forced_failure = self.fail_next > 0
+            self.fail_next -= forced_failure
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if forced_failure or random.random() < self.error_rate:
+            return 503, {"error": {"code": 9999, "message": "Internal application error."}}
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        city = query.get("q", [""])[0]
+        if city.lower().startswith("nowhere"):
+            if parsed.path.endswith("/search.json"):
+                return 200, []
+            return 400, {"error": {"code": 1006, "message": "No matching location found."}}
+        if parsed.path.endswith("/search.json"):
+            return 200, [{"name": city.title(), "region": "", "country": "Stubland"}]
+        if parsed.path.endswith("/forecast.json"):
+            return 200, city_weather(city, int(query.get("days", ["1"])[0]))
+        return 404, {"error": {"code": 1005, "message": "API URL is invalid."}}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub WeatherAPI server")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+    stub = StubWeatherAPI(port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    print(f"Stub WeatherAPI at {stub.url} (set WEATHER_API_BASE to this)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
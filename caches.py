@@ -0,0 +1,269 @@
+"""Disk-backed weather cache and city index sharing one throttled, atomic JSON persistence helper."""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def cache_key(city):
+    """Normalize city name into a cache key."""
+    return " ".join(city.lower().split())
+
+def write_json_atomic(path, data):
+    """Write data as JSON via a unique temp file in the same directory, then swap it into place."""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class JsonPersisted:
+    """In-memory state guarded by `lock`, flushed to a JSON file at most once per flush_interval.
+
+    Subclasses implement snapshot() and set `dirty` under the lock whenever the
+    state changes. Writes happen outside the lock, so readers never wait on disk.
+    """
+
+    label = "State"
+
+    def __init__(self, path, flush_interval=30):
+        # Resolved now so the exit-time flush lands in the same place if the cwd changes
+        self.path = os.path.abspath(path)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.last_save = time.monotonic()
+
+    def snapshot(self):
+        """Return the JSON-serializable state to write; called with the lock held."""
+        raise NotImplementedError
+
+    def save(self):
+        """Atomically write the state to disk if it changed since the last save."""
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                snapshot = self.snapshot()
+                self.dirty = False
+            self.last_save = time.monotonic()
+            try:
+                write_json_atomic(self.path, snapshot)
+            except OSError as e:
+                logger.warning("%s save error: %s", self.label, e)
+                with self.lock:
+                    self.dirty = True
+
+    def maybe_save(self):
+        """Flush to disk at most once per flush_interval; other threads skip while a save runs."""
+        if not self.dirty or time.monotonic() - self.last_save < self.flush_interval:
+            return
+        if self.save_lock.locked():
+            return
+        self.save()
+
+class WeatherCache(JsonPersisted):
+    """Thread-safe LRU cache of weather data with TTLs, persistence and single-flight fetches."""
+
+    label = "Weather cache"
+
+    def __init__(self, path, max_entries, flush_interval=30):
+        super().__init__(path, flush_interval)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.key_locks = {}
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+        self.load()
+
+    def load(self):
+        """Warm the cache from disk, skipping legacy single-day entries and malformed ones."""
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if not isinstance(saved, dict):
+            logger.warning("Ignoring weather cache %s: expected a JSON object", self.path)
+            return
+        for key, entry in saved.items():
+            try:
+                data = entry["data"]
+                if not isinstance(data, dict):
+                    raise TypeError(f"data is {type(data).__name__}, not an object")
+                if "current" not in data or "days" not in data:
+                    # Legacy single-day {"temp", "condition"} entries cannot answer forecast days; refetch instead
+                    continue
+                self.entries[cache_key(key)] = (data, float(entry["timestamp"]))
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                logger.warning("Skipping malformed weather cache entry %r: %r", key, e)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def snapshot(self):
+        return {key: {"data": data, "timestamp": ts} for key, (data, ts) in self.entries.items()}
+
+    def get(self, key, ttl):
+        """Return cached data if younger than ttl seconds, else None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[1] > ttl:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def get_stale(self, key):
+        """Return cached data regardless of age, else None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[0] if entry else None
+
+    def put(self, key, data):
+        """Store data, evicting the least recently used entries beyond the size cap."""
+        with self.lock:
+            self.entries[key] = (data, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self.dirty = True
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get_or_fetch(self, key, ttl, fetch):
+        """Return (data, stale) for key, calling fetch() at most once per key across concurrent misses.
+
+        If fetch raises and an expired entry exists, the stale entry is returned instead.
+        """
+        data = self.get(key, ttl)
+        if data is not None:
+            self.count("hits")
+            return data, False
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have filled the entry while we waited
+            data = self.get(key, ttl)
+            if data is not None:
+                self.count("hits")
+                return data, False
+            self.count("misses")
+            try:
+                data = fetch()
+                stale = False
+            except Exception:
+                data = self.get_stale(key)
+                if data is None:
+                    raise
+                self.count("stale")
+                stale = True
+            else:
+                self.put(key, data)
+            finally:
+                # Only drop the key lock once the entry is stored, so late arrivals see it
+                with self.lock:
+                    self.key_locks.pop(key, None)
+        self.maybe_save()
+        return data, stale
+
+    def snapshot_stats(self):
+        """Return hit/miss/stale counters plus current size."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self.entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+class CityIndex(JsonPersisted):
+    """Lazily loaded, disk-backed index of known-good and known-bad city names.
+
+    Both sets are size-capped, oldest entries dropped first, and rejected names
+    expire after negative_ttl. Changes are flushed to disk at most once per
+    flush_interval, outside the lock that lookups take.
+    """
+
+    label = "City index"
+
+    def __init__(self, path, negative_ttl, max_known=10000, max_unknown=2000, flush_interval=30):
+        super().__init__(path, flush_interval)
+        self.negative_ttl = negative_ttl
+        self.max_known = max_known
+        self.max_unknown = max_unknown
+        self.known = None
+        self.unknown = None
+
+    def ensure_loaded(self):
+        """Load the index on first use; callers must hold the lock."""
+        if self.known is not None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            saved = {}
+        self.known = OrderedDict.fromkeys(saved.get("known", []))
+        self.unknown = OrderedDict(sorted(saved.get("unknown", {}).items(), key=lambda item: item[1]))
+        self.prune()
+
+    def prune(self):
+        """Drop expired rejections and trim both sets to their caps; callers must hold the lock."""
+        cutoff = time.time() - self.negative_ttl
+        # unknown is ordered by rejection time, so expired names sit at the front
+        while self.unknown and next(iter(self.unknown.values())) < cutoff:
+            self.unknown.popitem(last=False)
+        while len(self.unknown) > self.max_unknown:
+            self.unknown.popitem(last=False)
+        while len(self.known) > self.max_known:
+            self.known.popitem(last=False)
+
+    def snapshot(self):
+        self.prune()
+        return {"known": list(self.known), "unknown": dict(self.unknown)}
+
+    def lookup(self, city):
+        """Return True for a known city, False for a recently rejected one, None if unseen."""
+        key = cache_key(city)
+        with self.lock:
+            self.ensure_loaded()
+            if key in self.known:
+                return True
+            rejected_at = self.unknown.get(key)
+            if rejected_at is not None and time.time() - rejected_at <= self.negative_ttl:
+                return False
+            return None
+
+    def add_known(self, *cities):
+        keys = [cache_key(c) for c in cities if c]
+        with self.lock:
+            self.ensure_loaded()
+            if all(key in self.known for key in keys):
+                return
+            for key in keys:
+                self.known[key] = None
+                self.unknown.pop(key, None)
+            self.prune()
+            self.dirty = True
+        self.maybe_save()
+
+    def add_unknown(self, city):
+        key = cache_key(city)
+        with self.lock:
+            self.ensure_loaded()
+            self.unknown.pop(key, None)
+            self.unknown[key] = time.time()
+            self.prune()
+            self.dirty = True
+        self.maybe_save()
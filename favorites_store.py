@@ -0,0 +1,150 @@
+"""SQLite-backed favorites storage with per-user namespacing, dedup and pagination."""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    outfit TEXT NOT NULL,
+    created REAL NOT NULL,
+    UNIQUE (user, outfit)
+);
+CREATE INDEX IF NOT EXISTS favorites_user_id ON favorites (user, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+logger = logging.getLogger(__name__)
+
+class FavoritesStore:
+    """Favorites kept in a WAL-mode SQLite database, safe across threads and worker processes.
+
+    Each thread gets its own connection; SQLite's file locking serializes writers,
+    so concurrent saves never lose or corrupt entries. Saves are a single indexed
+    insert and listing reads one page, so both stay flat as the table grows.
+    """
+
+    def __init__(self, path, legacy_path=None, default_user="default"):
+        self.path = path
+        self.default_user = default_user
+        self.local = threading.local()
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+        if legacy_path:
+            self.migrate_legacy(legacy_path)
+        self.legacy_claimed = self.connect().execute("SELECT 1 FROM meta WHERE key = 'legacy_owner'").fetchone() is not None
+
+    def connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def migrate_legacy(self, legacy_path):
+        """Import a legacy favorites.json list once, under the default user, then rename the file."""
+        if not os.path.exists(legacy_path):
+            return
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone()
+            if not done:
+                legacy = self.read_legacy(legacy_path)
+                if legacy is None:
+                    conn.execute("ROLLBACK")
+                    return
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO favorites (user, outfit, created) VALUES (?, ?, ?)",
+                    [(self.default_user, outfit, now) for outfit in legacy if isinstance(outfit, str) and outfit],
+                )
+                conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)", (str(now),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            os.replace(legacy_path, f"{legacy_path}.migrated")
+        except FileNotFoundError:
+            pass  # Another worker already moved it
+
+    def claim_legacy(self, user):
+        """Move the imported legacy favorites from the default user to user; only the first caller gets them."""
+        if self.legacy_claimed:
+            return False
+        conn = self.connect()
+        with conn:
+            # The meta insert takes the write lock, so concurrent claims across workers serialize here
+            claimed = conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('legacy_owner', ?)", (user,)).rowcount == 1
+            if claimed:
+                conn.execute("UPDATE favorites SET user = ? WHERE user = ?", (user, self.default_user))
+        self.legacy_claimed = True
+        return claimed
+
+    def read_legacy(self, legacy_path):
+        """Return the legacy favorites list, or None if the file cannot be salvaged."""
+        with open(legacy_path, "r") as f:
+            text = f.read()
+        try:
+            legacy = json.loads(text)
+        except ValueError:
+            # Interrupted read-modify-write saves could leave trailing garbage
+            try:
+                legacy, _ = json.JSONDecoder().raw_decode(text)
+            except ValueError:
+                legacy = None
+        if not isinstance(legacy, list):
+            # Left in place so nothing is lost; the import is retried on the next start
+            logger.warning("Cannot import %s: not a readable JSON list, leaving it in place", legacy_path)
+            return None
+        return legacy
+
+    def add(self, outfit, user=None):
+        """Save outfit for user; returns False if it was already saved."""
+        conn = self.connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO favorites (user, outfit, created) VALUES (?, ?, ?)",
+                (user or self.default_user, outfit, time.time()),
+            )
+        return cursor.rowcount == 1
+
+    def list(self, user=None, after=None, before=None, per_page=50):
+        """Return (outfits, prev_cursor, next_cursor) for one page of user's favorites, oldest first.
+
+        Pages are keyed on row id rather than offset, so any page costs one index
+        range scan: pass next_cursor back as `after` or prev_cursor as `before`.
+        A cursor is None when there is nothing further in that direction.
+        """
+        user = user or self.default_user
+        conn = self.connect()
+        if before is not None:
+            rows = conn.execute(
+                "SELECT id, outfit FROM favorites WHERE user = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                (user, before, per_page + 1),
+            ).fetchall()
+            has_prev = len(rows) > per_page
+            rows = rows[:per_page][::-1]
+            has_next = bool(rows) and self.has_row(conn, user, "id > ?", rows[-1][0])
+        else:
+            rows = conn.execute(
+                "SELECT id, outfit FROM favorites WHERE user = ? AND id > ? ORDER BY id LIMIT ?",
+                (user, after or 0, per_page + 1),
+            ).fetchall()
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+            has_prev = bool(rows) and self.has_row(conn, user, "id < ?", rows[0][0])
+        prev_cursor = rows[0][0] if has_prev else None
+        next_cursor = rows[-1][0] if has_next else None
+        return [outfit for _, outfit in rows], prev_cursor, next_cursor
+
+    def has_row(self, conn, user, condition, row_id):
+        return conn.execute(f"SELECT 1 FROM favorites WHERE user = ? AND {condition} LIMIT 1", (user, row_id)).fetchone() is not None
@@ -0,0 +1,43 @@
+"""Low-overhead sampling profiler that aggregates thread stacks in collapsed (flamegraph) format."""
+import sys
+import threading
+from collections import Counter
+
+class SamplingProfiler:
+    """Samples every other thread's stack each `interval` seconds from a daemon thread."""
+
+    def __init__(self, interval=0.01, max_depth=40):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                with self.lock:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self, limit=None):
+        """Return sampled stacks as 'frame;frame;frame count' lines, most frequent first."""
+        with self.lock:
+            top = self.samples.most_common(limit)
+        return "\n".join(f"{stack} {count}" for stack, count in top) + "\n"
@@ -0,0 +1,101 @@
+import importlib
+import json
+import os
+import time
+
+import pytest
+
+from benchmarks.stub_server import StubWeatherAPI
+from caches import CityIndex, WeatherCache
+from weather_client import WeatherClient
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    # app opens its data files at import time, so import it from an empty directory
+    original_cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    try:
+        yield importlib.import_module("app")
+    finally:
+        os.chdir(original_cwd)
+
+@pytest.fixture
+def stub():
+    server = StubWeatherAPI().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def app(app_module, stub, tmp_path, monkeypatch):
+    """The app module with a fresh weather cache, city index and client pointed at the stub."""
+    monkeypatch.setattr(app_module, "weather_client", WeatherClient("test-key", base_url=stub.url, retries=0))
+    monkeypatch.setattr(app_module, "weather_cache", WeatherCache(tmp_path / "weather_cache.json", 100))
+    monkeypatch.setattr(app_module, "city_index", CityIndex(tmp_path / "city_index.json", 3600))
+    return app_module
+
+def test_batch_fetches_each_city_once(app, stub):
+    rows = [{"city": "Oslo", "day": day % 4} for day in range(20)] + [{"city": " oslo ", "day": 0}]
+    results = list(app.recommend_batch(rows))
+    assert len(results) == 21
+    assert all(result["recommendation"] for result in results)
+    assert stub.requests == 1
+
+def test_batch_fetches_unknown_city_once_then_uses_index(app, stub):
+    rows = [{"city": "Nowhereville", "day": day % 4} for day in range(20)]
+    results = list(app.recommend_batch(rows))
+    assert len(results) == 20
+    assert all(result["recommendation"] is None and result["error"] for result in results)
+    assert stub.requests == 1
+
+    # The rejection is remembered, so a second batch never reaches WeatherAPI
+    results = list(app.recommend_batch(rows))
+    assert all(result["error"].startswith("Invalid city") for result in results)
+    assert stub.requests == 1
+
+def test_malformed_jsonl_line_becomes_invalid_row(app, tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"city": "Oslo"}\n{not json\n{"city": "Lima", "day": 1}\n')
+    results = sorted(app.recommend_batch(app.read_batch_file(str(path))), key=lambda result: result["row"])
+    assert [result["row"] for result in results] == [0, 1, 2]
+    assert results[1]["error"].startswith("Invalid row: line 2 is not valid JSON")
+    assert results[0]["recommendation"] and results[2]["recommendation"]
+
+def test_legacy_single_day_entry_is_refetched(app, stub, tmp_path, monkeypatch):
+    path = tmp_path / "legacy_cache.json"
+    path.write_text(json.dumps({"Oslo": {"data": {"temp": 22.0, "condition": "clear"}, "timestamp": time.time()}}))
+    monkeypatch.setattr(app, "weather_cache", WeatherCache(path, 100))
+    weather, error = app.get_weather("Oslo", 1)
+    assert error is None
+    assert weather != app.FALLBACK_WEATHER
+    assert stub.requests == 1
+
+def test_current_weather_expires_before_forecast_days(app, stub, monkeypatch):
+    monkeypatch.setattr(app, "CACHE_TTL_CURRENT", 60)
+    monkeypatch.setattr(app, "CACHE_TTL_FORECAST", 3600)
+    app.get_weather("Oslo", 0)
+    assert stub.requests == 1
+    # Age the bundle past the current-conditions TTL but not the forecast TTL
+    data, timestamp = app.weather_cache.entries["oslo"]
+    app.weather_cache.entries["oslo"] = (data, timestamp - 120)
+
+    for day in (1, 2, 3):
+        weather, error = app.get_weather("Oslo", day)
+        assert error is None
+    assert stub.requests == 1
+
+    app.get_weather("Oslo", 0)
+    assert stub.requests == 2
+
+def test_index_rejects_unknown_city_from_the_forecast_call(app, stub):
+    client = app.app.test_client()
+    response = client.post("/", data={"city": "Nowhereville", "day": "0"})
+    assert response.status_code == 200
+    assert b"Invalid city: City not found" in response.data
+    assert stub.requests == 1
+    assert app.city_index.lookup("Nowhereville") is False
+
+def test_recommendation_cache_keeps_int_and_float_temperatures_apart(app):
+    as_int = app.recommend_outfit("casual", "blue", 15, "clear", "bold", "Oslo", "male", 0)
+    as_float = app.recommend_outfit("casual", "blue", 15.0, "clear", "bold", "Oslo", "male", 0)
+    assert "Weather: 15°C" in as_int
+    assert "Weather: 15.0°C" in as_float
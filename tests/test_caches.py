@@ -0,0 +1,97 @@
+import json
+import threading
+
+import pytest
+from requests.exceptions import HTTPError
+
+from benchmarks.stub_server import StubWeatherAPI
+from caches import WeatherCache
+from weather_client import WeatherClient
+
+@pytest.fixture
+def stub():
+    server = StubWeatherAPI().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def client(stub):
+    return WeatherClient("test-key", base_url=stub.url, retries=0, breaker_threshold=100)
+
+def make_cache(tmp_path, max_entries=10):
+    return WeatherCache(tmp_path / "weather_cache.json", max_entries, flush_interval=0)
+
+def test_concurrent_misses_share_one_fetch(stub, client, tmp_path):
+    stub.latency = 0.1
+    cache = make_cache(tmp_path)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def lookup():
+        barrier.wait()
+        results.append(cache.get_or_fetch("oslo", 60, lambda: client.forecast("Oslo", 4)))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub.requests == 1
+    assert len(results) == 8
+    assert all(data == results[0][0] and not stale for data, stale in results)
+    stats = cache.snapshot_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 7
+
+def test_fresh_entry_is_served_without_fetching(stub, client, tmp_path):
+    cache = make_cache(tmp_path)
+    fetch = lambda: client.forecast("Oslo", 4)
+    cache.get_or_fetch("oslo", 60, fetch)
+    cache.get_or_fetch("oslo", 60, fetch)
+    assert stub.requests == 1
+
+def test_expired_entry_is_served_stale_when_fetch_fails(stub, client, tmp_path):
+    cache = make_cache(tmp_path)
+    fetch = lambda: client.forecast("Oslo", 4)
+    data, _ = cache.get_or_fetch("oslo", 60, fetch)
+    stub.fail_next = 1
+    stale_data, stale = cache.get_or_fetch("oslo", -1, fetch)
+    assert stale
+    assert stale_data == data
+    assert stub.requests == 2
+    assert cache.snapshot_stats()["stale"] == 1
+
+def test_fetch_error_without_cached_entry_propagates(stub, client, tmp_path):
+    cache = make_cache(tmp_path)
+    stub.fail_next = 1
+    with pytest.raises(HTTPError):
+        cache.get_or_fetch("oslo", 60, lambda: client.forecast("Oslo", 4))
+
+def test_least_recently_used_entry_is_evicted(stub, client, tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    for city in ("Oslo", "Lima"):
+        cache.get_or_fetch(city.lower(), 60, lambda: client.forecast(city, 4))
+    # Touch oslo so lima becomes the eviction candidate
+    cache.get_or_fetch("oslo", 60, lambda: client.forecast("Oslo", 4))
+    cache.get_or_fetch("rome", 60, lambda: client.forecast("Rome", 4))
+    assert stub.requests == 3
+    assert list(cache.entries) == ["oslo", "rome"]
+    assert cache.snapshot_stats()["evictions"] == 1
+
+    cache.get_or_fetch("lima", 60, lambda: client.forecast("Lima", 4))
+    assert stub.requests == 4
+
+def test_save_and_reload_round_trip(tmp_path):
+    cache = make_cache(tmp_path)
+    data = {"current": {"temp": 20, "condition": "clear"}, "days": [{"temp": 21, "min": 17, "max": 25, "condition": "sunny"}]}
+    cache.put("oslo", data)
+    cache.save()
+    assert make_cache(tmp_path).get("oslo", 60) == data
+
+def test_malformed_entries_are_skipped_on_load(tmp_path):
+    (tmp_path / "weather_cache.json").write_text(json.dumps({
+        "paris": {"temp": 1},
+        "lima": "x",
+        "rome": {"data": {"current": {"temp": 20, "condition": "clear"}, "days": []}, "timestamp": 1},
+    }))
+    assert list(make_cache(tmp_path).entries) == ["rome"]
@@ -0,0 +1,98 @@
+import json
+import threading
+
+from favorites_store import FavoritesStore
+
+def make_store(tmp_path, legacy=None):
+    legacy_path = tmp_path / "favorites.json"
+    if legacy is not None:
+        legacy_path.write_text(legacy)
+    return FavoritesStore(str(tmp_path / "favorites.db"), legacy_path=str(legacy_path))
+
+def test_concurrent_adds_from_many_threads_are_all_kept(tmp_path):
+    store = make_store(tmp_path)
+    barrier = threading.Barrier(8)
+
+    def save(worker):
+        barrier.wait()
+        for i in range(50):
+            store.add(f"outfit {worker}-{i}", "alice")
+            # Every thread also races on the same shared outfits
+            store.add(f"shared {i}", "alice")
+
+    threads = [threading.Thread(target=save, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    outfits, _, next_cursor = store.list("alice", per_page=1000)
+    assert next_cursor is None
+    assert len(outfits) == 8 * 50 + 50
+    assert len(set(outfits)) == len(outfits)
+
+def test_stores_opened_separately_share_the_database(tmp_path):
+    first, second = make_store(tmp_path), make_store(tmp_path)
+    assert first.add("Navy blazer", "alice")
+    assert not second.add("Navy blazer", "alice")
+    assert second.list("alice")[0] == ["Navy blazer"]
+
+def test_duplicates_are_ignored_per_user(tmp_path):
+    store = make_store(tmp_path)
+    assert store.add("Navy blazer", "alice")
+    assert not store.add("Navy blazer", "alice")
+    assert store.add("Navy blazer", "bob")
+    assert store.list("alice")[0] == ["Navy blazer"]
+    assert store.list("bob")[0] == ["Navy blazer"]
+
+def test_pages_follow_cursors_in_both_directions(tmp_path):
+    store = make_store(tmp_path)
+    for i in range(7):
+        store.add(f"outfit {i}", "alice")
+        store.add(f"other {i}", "bob")
+
+    pages, after = [], None
+    while True:
+        outfits, prev_cursor, after = store.list("alice", after=after, per_page=3)
+        pages.append(outfits)
+        if after is None:
+            break
+    assert pages == [["outfit 0", "outfit 1", "outfit 2"], ["outfit 3", "outfit 4", "outfit 5"], ["outfit 6"]]
+
+    outfits, prev_cursor, next_cursor = store.list("alice", before=prev_cursor, per_page=3)
+    assert outfits == ["outfit 3", "outfit 4", "outfit 5"]
+    assert prev_cursor is not None and next_cursor is not None
+    outfits, prev_cursor, _ = store.list("alice", before=prev_cursor, per_page=3)
+    assert outfits == ["outfit 0", "outfit 1", "outfit 2"]
+    assert prev_cursor is None
+
+def test_legacy_file_is_migrated_once(tmp_path):
+    store = make_store(tmp_path, json.dumps(["Navy blazer", "Navy blazer", "", 5, "Red dress"]))
+    assert store.list()[0] == ["Navy blazer", "Red dress"]
+    assert not (tmp_path / "favorites.json").exists()
+    assert (tmp_path / "favorites.json.migrated").exists()
+
+    # A favorites.json reappearing later is not imported twice
+    (tmp_path / "favorites.json").write_text(json.dumps(["Green coat"]))
+    assert make_store(tmp_path).list()[0] == ["Navy blazer", "Red dress"]
+
+def test_damaged_legacy_file_keeps_its_readable_prefix(tmp_path):
+    # An interrupted read-modify-write save could leave trailing garbage
+    store = make_store(tmp_path, '["Navy blazer", "Red dress"]ss"]')
+    assert store.list()[0] == ["Navy blazer", "Red dress"]
+
+def test_first_claim_takes_the_legacy_favorites(tmp_path):
+    store = make_store(tmp_path, json.dumps(["Navy blazer"]))
+    assert store.claim_legacy("alice")
+    assert not make_store(tmp_path).claim_legacy("bob")
+    assert store.list("alice")[0] == ["Navy blazer"]
+    assert store.list("bob")[0] == []
+    assert store.list()[0] == []
+
+def test_unreadable_legacy_file_is_left_in_place(tmp_path):
+    store = make_store(tmp_path, "not json at all")
+    assert store.list()[0] == []
+    assert (tmp_path / "favorites.json").exists()
+
+    # Once repaired, the next start imports it
+    (tmp_path / "favorites.json").write_text(json.dumps(["Navy blazer"]))
+    assert make_store(tmp_path).list()[0] == ["Navy blazer"]
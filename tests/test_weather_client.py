@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+from requests.exceptions import HTTPError, Timeout
+
+from benchmarks.stub_server import StubWeatherAPI
+from weather_client import AsyncWeatherClient, CircuitOpenError, CityNotFoundError, WeatherClient
+
+@pytest.fixture
+def stub():
+    server = StubWeatherAPI().start()
+    yield server
+    server.stop()
+
+def make_client(stub, **kwargs):
+    options = {"timeout": 2, "retries": 2, "backoff": 0.01, "breaker_threshold": 3, "breaker_reset": 0.2}
+    options.update(kwargs)
+    return WeatherClient("test-key", base_url=stub.url, **options)
+
+def test_forecast_returns_payload(stub):
+    data = make_client(stub).forecast("Oslo", 4)
+    assert data["location"]["name"] == "Oslo"
+    assert len(data["forecast"]["forecastday"]) == 4
+
+def test_retries_503_then_succeeds(stub):
+    stub.fail_next = 2
+    client = make_client(stub)
+    assert client.search("Paris")[0]["name"] == "Paris"
+    assert stub.requests == 3
+    assert client.stats()["retries"] == 2
+    assert client.breaker.state == "closed"
+
+def test_gives_up_after_retries(stub):
+    stub.fail_next = 10
+    client = make_client(stub, retries=1, breaker_threshold=10)
+    with pytest.raises(HTTPError):
+        client.search("Paris")
+    assert stub.requests == 2
+
+def test_unknown_city_raises_city_not_found(stub):
+    client = make_client(stub)
+    with pytest.raises(CityNotFoundError):
+        client.forecast("Nowhereville", 4)
+    # A 400 is an answer, not an outage
+    assert client.breaker.state == "closed"
+
+def test_breaker_opens_then_recovers_through_half_open_trial(stub):
+    client = make_client(stub, retries=0)
+    stub.fail_next = 3
+    for _ in range(3):
+        with pytest.raises(HTTPError):
+            client.search("Paris")
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.search("Paris")
+    assert stub.requests == 3
+
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+    stub.fail_next = 1
+    with pytest.raises(HTTPError):
+        client.search("Paris")
+    # A failed trial reopens the circuit immediately
+    assert client.breaker.state == "open"
+
+    time.sleep(0.25)
+    assert client.search("Paris")[0]["name"] == "Paris"
+    assert client.breaker.state == "closed"
+
+def test_each_failed_attempt_counts_against_breaker(stub):
+    stub.fail_next = 10
+    client = make_client(stub, retries=5)
+    with pytest.raises((HTTPError, CircuitOpenError)):
+        client.search("Paris")
+    assert client.breaker.state == "open"
+    assert stub.requests == 3
+
+def test_retries_share_one_deadline(stub):
+    stub.latency = 0.3
+    client = make_client(stub, timeout=0.2, retries=3)
+    start = time.monotonic()
+    with pytest.raises(Timeout):
+        client.search("Paris")
+    assert time.monotonic() - start < 0.5
+
+def test_async_client(stub):
+    client = AsyncWeatherClient(make_client(stub))
+
+    async def fetch_all():
+        return await asyncio.gather(client.forecast("Oslo", 2), client.search("Lima"))
+
+    forecast, matches = asyncio.run(fetch_all())
+    assert len(forecast["forecast"]["forecastday"]) == 2
+    assert matches[0]["name"] == "Lima"
@@ -0,0 +1,190 @@
+"""WeatherAPI client with connection pooling, retries, a circuit breaker and an async wrapper."""
+import asyncio
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, RequestException, Timeout
+
+DEFAULT_BASE_URL = "http://api.weatherapi.com/v1"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class CityNotFoundError(Exception):
+    """Raised when WeatherAPI reports that a location does not exist."""
+
+class CircuitOpenError(RequestException):
+    """Raised without calling WeatherAPI while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and lets one trial call through after `reset_after` seconds."""
+
+    def __init__(self, threshold=5, reset_after=30):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may be attempted now."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_after or self.trial_in_flight:
+                raise CircuitOpenError("WeatherAPI is unavailable (circuit open).")
+            self.trial_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+class WeatherClient:
+    """Thread-safe WeatherAPI client sharing one pooled keep-alive session.
+
+    Calls are limited to `max_concurrency` in flight, retried with jittered
+    exponential backoff on connection errors, timeouts and 429/5xx responses
+    within an overall `timeout` deadline, and short-circuited by a
+    CircuitBreaker while WeatherAPI is failing.
+    `on_call(endpoint, seconds, outcome)` is invoked after every attempt.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, timeout=5, max_concurrency=8,
+                 retries=2, backoff=0.2, breaker_threshold=5, breaker_reset=30, on_call=None):
+        self.api_key = api_key
+        self.on_call = on_call
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency_lock = threading.Lock()
+        self.latency = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0, "errors": 0, "retries": 0}
+
+    def record_latency(self, endpoint, seconds, outcome, failed):
+        if self.on_call:
+            self.on_call(endpoint, seconds, outcome)
+        with self.latency_lock:
+            self.latency["count"] += 1
+            self.latency["total"] += seconds
+            self.latency["last"] = seconds
+            self.latency["max"] = max(self.latency["max"], seconds)
+            if failed:
+                self.latency["errors"] += 1
+
+    def stats(self):
+        """Return upstream call counts, latency figures (seconds) and breaker state."""
+        with self.latency_lock:
+            stats = dict(self.latency)
+        stats["avg"] = round(stats["total"] / stats["count"], 4) if stats["count"] else 0.0
+        stats["circuit"] = self.breaker.state
+        return stats
+
+    def get(self, endpoint, **params):
+        """GET base_url/endpoint with retries; returns the final Response, raising RequestException on failure.
+
+        All attempts share one deadline of `timeout` seconds, so retries never
+        stretch a call past what a single attempt was allowed. Every failed
+        attempt counts against the circuit breaker.
+        """
+        params["key"] = self.api_key
+        deadline = time.monotonic() + self.timeout
+        for attempt in range(self.retries + 1):
+            self.breaker.before_call()
+            with self.slots:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.breaker.record_failure()
+                    raise Timeout(f"WeatherAPI call exceeded {self.timeout}s deadline.")
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=remaining)
+                    error = None
+                except (ConnectionError, Timeout) as e:
+                    response, error = None, e
+                except RequestException as e:
+                    self.record_latency(endpoint, time.perf_counter() - start, type(e).__name__, True)
+                    self.breaker.record_failure()
+                    raise
+            failed = error is not None or response.status_code in RETRYABLE_STATUS
+            outcome = type(error).__name__ if error is not None else str(response.status_code)
+            self.record_latency(endpoint, time.perf_counter() - start, outcome, failed)
+            if not failed:
+                self.breaker.record_success()
+                return response
+            self.breaker.record_failure()
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            if attempt == self.retries or time.monotonic() + delay >= deadline:
+                break
+            with self.latency_lock:
+                self.latency["retries"] += 1
+            # Back off without holding a concurrency slot
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        response.raise_for_status()
+        return response
+
+    def search(self, query):
+        """Return WeatherAPI autocomplete matches for query."""
+        response = self.get("search.json", q=query)
+        response.raise_for_status()
+        return response.json()
+
+    def forecast(self, query, days):
+        """Return the raw forecast.json payload, raising CityNotFoundError for unknown locations."""
+        response = self.get("forecast.json", q=query, days=days, aqi="no")
+        if response.status_code == 400:
+            api_error = response.json().get("error", {})
+            if api_error.get("code") == 1006:
+                raise CityNotFoundError(api_error.get("message", "No matching location found."))
+        response.raise_for_status()
+        return response.json()
+
+class AsyncWeatherClient:
+    """Asyncio front end for WeatherClient for async Flask/ASGI deployments.
+
+    Requests run on worker threads against the wrapped client's pooled
+    session, so retries, the circuit breaker and latency stats are shared.
+    """
+
+    def __init__(self, client, max_concurrency=None):
+        self.client = client
+        self.max_concurrency = max_concurrency or client.max_concurrency
+        self.slots = None
+
+    async def call(self, method, *args):
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_concurrency)
+        async with self.slots:
+            return await asyncio.to_thread(method, *args)
+
+    async def search(self, query):
+        return await self.call(self.client.search, query)
+
+    async def forecast(self, query, days):
+        return await self.call(self.client.forecast, query, days)